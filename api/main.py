@@ -7,43 +7,49 @@ Fonctionnalités principales :
 - Chargement de la configuration et des variables d'environnement.
 - Inclusion des routes REST définies dans api/routes.py.
 - Page d'accueil HTML moderne avec liens rapides (/, /users/, /docs).
+- Compression gzip des réponses volumineuses.
 - Gestion de la requête favicon.ico pour éviter les erreurs 404 dans les logs.
 
 Usage :
+    pip install -e .
     uvicorn api.main:app --reload
 
+    # Production (boucle uvloop + parseur HTTP httptools, un worker par cœur) :
+    uvicorn api.main:app --loop uvloop --http httptools --workers $(nproc)
+
 Prérequis :
     - Dépendances Python (voir requirements.txt)
     - Fichier .env avec GITHUB_TOKEN et API_ACCESS_TOKEN
 """
 
+import logging
 import os
-import sys
 from fastapi import FastAPI
-from dotenv import load_dotenv
-from fastapi.responses import HTMLResponse, Response
-
-# Ajouter le chemin du dossier parent pour accéder à extract_users
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 
-from extract_users import extract_users
+from env_loader import load_env
 from api.routes import router  # 👈 Import des routes
 
-# Chargement des variables d'environnement (.env)
-load_dotenv()
-print("[🐞] GITHUB_TOKEN dans FastAPI :", os.getenv("GITHUB_TOKEN"))
+log = logging.getLogger(__name__)
+
+# Chargement des variables d'environnement (.env), sans effet si déjà fait
+load_env()
+log.debug("[🐞] GITHUB_TOKEN défini dans FastAPI : %s", os.getenv("GITHUB_TOKEN") is not None)
 
-# Création de l'application FastAPI
-app = FastAPI()
+# Création de l'application FastAPI (sérialisation JSON via orjson)
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Compression gzip des réponses de plus de 1 Ko (liste /users/ notamment),
+# les petites réponses (détail utilisateur) sont envoyées telles quelles
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Inclusion des routes définies dans api/routes.py
 app.include_router(router)
 
 # Page d'accueil HTML stylée avec liens rapides et instructions
-@app.get("/", response_class=HTMLResponse)
-def read_root():
-    print("[INFO] Accès à la page d'accueil de l'API (/)")
-    return """
+# (encodée une seule fois en UTF-8 au chargement du module)
+_INDEX_HTML = ("""
     <html>
         <head>
             <title>Bienvenue sur l'API GitHub Users</title>
@@ -83,9 +89,19 @@ def read_root():
             </div>
         </body>
     </html>
-    """
+    """).encode("utf-8")
+
+@app.get("/", response_class=HTMLResponse)
+def read_root():
+    return Response(content=_INDEX_HTML, media_type="text/html")
 
 # Route pour ignorer la requête favicon.ico (évite le 404 dans les logs)
 @app.get("/favicon.ico")
 def ignore_favicon():
-    return Response(status_code=204)
\ No newline at end of file
+    return Response(status_code=204)
+
+# Lancement direct (python -m api.main) : "auto" sélectionne uvloop et httptools
+# lorsqu'ils sont installés (uvloop n'existe pas sous Windows)
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, loop="auto", http="auto")
@@ -7,7 +7,7 @@ Fonctionnalités :
 - Route publique pour lister tous les utilisateurs extraits (GET /users/)
 - Route protégée pour rechercher des utilisateurs par login (GET /users/search?q=...)
 - Route protégée pour obtenir le détail d'un utilisateur par login (GET /users/{login})
-- Chargement des données filtrées depuis data/filtered_users.json
+- Chargement des données filtrées depuis data/filtered_users.json (tableau JSON ou JSON Lines)
 - Authentification HTTP Basic sur les routes sensibles
 
 Prérequis :
@@ -16,32 +16,109 @@ Prérequis :
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from api.models import User
 from api.security import check_auth
-import json
-import traceback
+import ijson
+import mmap
+import orjson
+import logging
+import os
+import re
+
+log = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def _load_json(path):
+    """
+    Parse un fichier JSON en passant directement à orjson une vue mmap du fichier,
+    sans copie intermédiaire de son contenu dans le tas Python.
+    Accepte un tableau JSON ou du JSON Lines (un objet par ligne), détecté
+    d'après le premier caractère significatif du fichier. Un fichier vide est
+    un document JSON Lines vide.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []  # mmap refuse les fichiers vides
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = re.search(rb"\S", mm)
+            if first and first.group() == b"[":
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+            return [orjson.loads(line) for line in iter(mm.readline, b"") if line.strip()]
+
+
 # Chargement des utilisateurs filtrés depuis JSON au démarrage du module
 try:
-    with open("data/filtered_users.json", encoding="utf-8") as f:
-        users_data = json.load(f)
+    users_data = _load_json("data/filtered_users.json")
     users_dict = {user["login"]: user for user in users_data}
 except FileNotFoundError:
     users_data = []
     users_dict = {}
 
+# Index des logins en minuscules, construit une seule fois pour la recherche.
+# Les logins sont stockés en bytes (ASCII pour GitHub) : la recherche de
+# sous-chaîne sur bytes est plus rapide que sur str.
+_LOWER_LOGINS = [(user["login"].lower().encode(), user) for user in users_dict.values()]
+
+# Réponses de /users/{login} pré-calculées : adaptation des clés au modèle User attendu
+_USER_RESPONSES = {
+    login: {
+        "login": user.get("login"),
+        "id": user.get("id"),
+        "created_at": user.get("created_at"),
+        "bio": user.get("bio"),
+        "url": user.get("html_url", ""),          # <- attention ici
+        "avatar": user.get("avatar_url", ""),    # <- et ici
+    }
+    for login, user in users_dict.items()
+}
+_USER_RESPONSES_BY_LOWER_LOGIN = {login.lower(): user for login, user in _USER_RESPONSES.items()}
+
+# Cache en mémoire de data/users.json : (mtime, liste des utilisateurs déjà encodée en JSON)
+USERS_PATH = "data/users.json"
+# Au-delà de cette taille, /users/ est servi en streaming sans charger le fichier en mémoire
+USERS_STREAM_MIN_SIZE = 50 * 1024 * 1024
+_USERS_CACHE = (None, b"[]")
+try:
+    _stat = os.stat(USERS_PATH)
+    if _stat.st_size < USERS_STREAM_MIN_SIZE:
+        _USERS_CACHE = (_stat.st_mtime, orjson.dumps(_load_json(USERS_PATH)))
+except FileNotFoundError:
+    pass
+
+
+def _stream_users():
+    """
+    Génère le tableau JSON de data/users.json élément par élément (ijson),
+    sans jamais construire la liste complète en mémoire.
+    """
+    with open(USERS_PATH, "rb") as f:
+        yield b"["
+        for i, item in enumerate(ijson.items(f, "item", use_float=True)):
+            yield (b"," if i else b"") + orjson.dumps(item)
+        yield b"]"
+
 # 🔓 Route publique : retourne tous les utilisateurs extraits depuis data/users.json
 @router.get("/users/", summary="Lister tous les utilisateurs (non filtrés)")
 def get_users():
     """
     Retourne la liste brute des utilisateurs extraits (public, pas d'authentification).
+    Le fichier n'est relu et réencodé que si sa date de modification a changé :
+    les octets JSON en cache sont renvoyés tels quels (pas de jsonable_encoder).
+    Au-delà de USERS_STREAM_MIN_SIZE, il est transmis en streaming.
     """
+    global _USERS_CACHE
     try:
-        with open("data/users.json", "r", encoding="utf-8") as f:
-            users = json.load(f)
-        return users
+        stat = os.stat(USERS_PATH)
+        if stat.st_size >= USERS_STREAM_MIN_SIZE:
+            _USERS_CACHE = (None, b"[]")
+            return StreamingResponse(_stream_users(), media_type="application/json")
+        if stat.st_mtime != _USERS_CACHE[0]:
+            _USERS_CACHE = (stat.st_mtime, orjson.dumps(_load_json(USERS_PATH)))
+        return Response(content=_USERS_CACHE[1], media_type="application/json")
     except Exception as e:
         return {"error": str(e)}
 
@@ -51,37 +128,29 @@ def search_users(q: str, credentials=Depends(check_auth)):
     """
     Recherche les utilisateurs dont le login contient la chaîne q (authentification requise).
     """
-    print(f"Recherche pour: {q}")
+    log.debug("Recherche pour: %s", q)
     try:
-        results = [user for user in users_dict.values() if "login" in user and q.lower() in user["login"].lower()]
-        print(f"Nombre de résultats: {len(results)}")
+        q_lower = q.lower().encode()
+        # Un seul parcours de l'index, dans l'ordre du fichier
+        results = [user for login, user in _LOWER_LOGINS if q_lower in login]
+        log.debug("Nombre de résultats: %d", len(results))
         return results
     except Exception as e:
-        traceback.print_exc()  # Affiche la trace complète de l'erreur
+        log.exception("Erreur lors de la recherche pour: %s", q)  # Trace complète de l'erreur
         return {"error": str(e)}
 
 # 🔐 Route protégée : obtenir un utilisateur par login exact
-@router.get("/users/{login}", response_model=User, summary="Obtenir un utilisateur", description="Retourne les détails d'un utilisateur par son login exact.")
-def get_user(login: str, credentials=Depends(check_auth)):
+# Pas de revalidation Pydantic à chaque requête : les réponses sont pré-calculées,
+# le modèle User reste documenté dans OpenAPI via `responses`.
+@router.get("/users/{login}", response_model=None, responses={200: {"model": User}}, summary="Obtenir un utilisateur", description="Retourne les détails d'un utilisateur par son login exact.")
+def get_user(login: str, credentials=Depends(check_auth)) -> ORJSONResponse:
     """
     Retourne les détails d'un utilisateur (authentification requise).
-    Adapte les clés pour correspondre au modèle User attendu.
+    Les réponses sont préparées au chargement du module au format du modèle User
+    et renvoyées directement via ORJSONResponse (pas de jsonable_encoder).
     """
-    try:
-        login_lower = login.lower()
-        user = next((u for u in users_dict.values() if u.get("login", "").lower() == login_lower), None)
-        if user is None:
-            raise HTTPException(status_code=404, detail=f"Utilisateur '{login}' non trouvé.")
-        # Adaptation des clés pour correspondre au modèle User attendu
-        user_mapped = {
-            "login": user.get("login"),
-            "id": user.get("id"),
-            "created_at": user.get("created_at"),
-            "bio": user.get("bio"),
-            "url": user.get("html_url", ""),          # <- attention ici
-            "avatar": user.get("avatar_url", ""),    # <- et ici
-        }
-        return user_mapped
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+    # Accès direct par login exact, sinon par login en minuscules
+    user = _USER_RESPONSES.get(login) or _USER_RESPONSES_BY_LOWER_LOGIN.get(login.lower())
+    if user is None:
+        raise HTTPException(status_code=404, detail=f"Utilisateur '{login}' non trouvé.")
+    return ORJSONResponse(user)
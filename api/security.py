@@ -15,20 +15,22 @@ Prérequis :
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+import hashlib
 import secrets
 import os
-from dotenv import load_dotenv
+from env_loader import load_env
 
-# Charger les variables d'environnement depuis un fichier .env
-load_dotenv()
+# Charger les variables d'environnement depuis un fichier .env (une seule fois par processus)
+load_env()
 
 # Initialisation de la sécurité HTTP Basic
 security = HTTPBasic()
 
-# Définir les identifiants autorisés (ici : admin + mot de passe depuis .env)
+# Définir les identifiants autorisés (ici : admin + empreinte SHA-256 du mot de passe depuis .env)
+# L'empreinte est calculée une seule fois au chargement du module
 try:
     AUTHORIZED_USERS = {
-        "admin": os.environ["API_ACCESS_TOKEN"]
+        "admin": hashlib.sha256(os.environ["API_ACCESS_TOKEN"].encode()).digest()
     }
 except KeyError:
     raise RuntimeError("API_ACCESS_TOKEN n'est pas défini dans le fichier .env ou l'environnement.")
@@ -45,9 +47,10 @@ def check_auth(credentials: HTTPBasicCredentials = Depends(security)) -> str:
 
     # Vérifie si le nom d'utilisateur est autorisé
     if username in AUTHORIZED_USERS:
-        valid_password = AUTHORIZED_USERS[username]
-        # Compare les mots de passe de façon sécurisée
-        if secrets.compare_digest(password, valid_password):
+        valid_digest = AUTHORIZED_USERS[username]
+        # Compare les empreintes des mots de passe de façon sécurisée (temps constant)
+        password_digest = hashlib.sha256(password.encode()).digest()
+        if secrets.compare_digest(password_digest, valid_digest):
             return username
 
     # Si l'authentification échoue, lève une erreur 401
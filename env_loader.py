@@ -0,0 +1,24 @@
+"""
+env_loader.py
+
+Chargement des variables d'environnement depuis le fichier .env.
+
+Fonctionnalités :
+- Charge le fichier .env une seule fois par processus, quel que soit le nombre
+  de modules qui appellent load_env() (extract_users.py, api/security.py, api/main.py).
+- Aucun effet de bord à l'import : le chargement n'a lieu qu'à l'appel de load_env().
+"""
+
+from dotenv import load_dotenv
+
+_ENV_LOADED = False
+
+
+def load_env():
+    """
+    Charge le fichier .env si ce n'est pas déjà fait.
+    """
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        load_dotenv()
+        _ENV_LOADED = True
@@ -9,7 +9,7 @@ Script d'extraction d'utilisateurs GitHub :
 - Sauvegarde le résultat dans data/users.json.
 
 Usage :
-    python extract_users.py --max-users 60
+    python extract_users.py --max-users 60 [--verbose]
 
 Prérequis :
     - Dépendances Python (voir requirements.txt)
@@ -19,18 +19,26 @@ Prérequis :
 # ==== Import des bibliothèques nécessaires ====
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dotenv import load_dotenv
+from env_loader import load_env
+from filtered_users import metadata_path
 import argparse
+import logging
+
+log = logging.getLogger(__name__)
 
 # ==== Étape 2 : Chargement du token GitHub depuis .env ====
-load_dotenv()
+load_env()
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 if not GITHUB_TOKEN:
-    print("[❌] Token GitHub non trouvé dans .env (GITHUB_TOKEN).")
+    log.error("[❌] Token GitHub non trouvé dans .env (GITHUB_TOKEN).")
     exit(1)
 
 # Préparation des headers pour l'authentification à l'API GitHub
@@ -42,157 +50,321 @@ HEADERS = {
 BASE_URL = "https://api.github.com"
 USERS_ENDPOINT = f"{BASE_URL}/users"
 
+# Nombre de requêtes de détails utilisateur exécutées en parallèle
+MAX_WORKERS = 16
+
+# Session HTTP partagée : réutilise les connexions (keep-alive) entre les requêtes
+# et relance automatiquement les erreurs temporaires avec un délai exponentiel
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+))
+
+# Quota partagé entre les threads : l'événement est effacé pendant une pause
+# de quota pour suspendre toutes les requêtes en cours de préparation
+RATE_LIMIT_OK = threading.Event()
+RATE_LIMIT_OK.set()
+_RATE_LIMIT_LOCK = threading.Lock()
+
+# Arrêt demandé (Ctrl+C ou fin d'extraction) : interrompt les pauses en cours dans
+# les threads, qui ne reçoivent pas KeyboardInterrupt
+STOP_REQUESTED = threading.Event()
+
 # === Création dossier pour sauvegarder les données ===
 os.makedirs("data", exist_ok=True)
 
+# === Cache des ETag GitHub : login -> {"etag": ..., "details": {...}} ===
+ETAG_CACHE_PATH = "data/etag_cache.json"
+
+def load_etag_cache(filename=ETAG_CACHE_PATH):
+    """
+    Charge le cache des ETag des exécutions précédentes (vide si absent ou illisible).
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_etag_cache(filename=ETAG_CACHE_PATH):
+    """
+    Sauvegarde le cache des ETag pour les prochaines exécutions.
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(ETAG_CACHE, f, ensure_ascii=False)
+
+# Rempli par extract_users() au début de chaque extraction (pas à l'import du module)
+ETAG_CACHE = {}
+
 # Fonction pour gérer le quota de l'API GitHub (attend si quota épuisé)
 def handle_rate_limit(response):
     """
     Étape 3 : Gestion des quotas de l'API GitHub.
     Pause si quota épuisé, en fonction des headers.
+    Un seul thread effectue la pause, les autres attendent sur RATE_LIMIT_OK.
     """
     remaining = int(response.headers.get("X-RateLimit-Remaining", 1))
     reset_time = int(response.headers.get("X-RateLimit-Reset", time.time()))
     if remaining == 0:
         wait_time = reset_time - time.time()
-        if wait_time > 0:
-            print(f"[⏳] Quota API GitHub épuisé. Pause jusqu'à {datetime.fromtimestamp(reset_time)} ({int(wait_time)}s)...")
-            time.sleep(wait_time + 5)
+        if wait_time <= 0:
+            return
+        with _RATE_LIMIT_LOCK:
+            pausing = RATE_LIMIT_OK.is_set()
+            RATE_LIMIT_OK.clear()
+        if not pausing:
+            RATE_LIMIT_OK.wait()
+            return
+        log.warning("[⏳] Quota API GitHub épuisé. Pause jusqu'à %s (%ds)...", datetime.fromtimestamp(reset_time), wait_time)
+        STOP_REQUESTED.wait(wait_time + 5)
+        RATE_LIMIT_OK.set()
 
 # Fonction pour récupérer les détails d'un utilisateur (login, id, avatar, etc.)
 def get_user_details(login):
     """
     Étape 1 : Récupérer les infos détaillées d'un utilisateur via /users/<login>.
     Renvoie un dict avec login, id, avatar_url, created_at, bio ou None si erreur.
+    Requête conditionnelle (If-None-Match) si un ETag est en cache : une réponse
+    304 renvoie les détails en cache et n'est pas décomptée du quota GitHub.
     """
     url = f"{USERS_ENDPOINT}/{login}"
+    cached = ETAG_CACHE.get(login)
+    headers = {"If-None-Match": cached["etag"]} if cached else None
     try:
-        response = requests.get(url, headers=HEADERS)
+        RATE_LIMIT_OK.wait()
+        if STOP_REQUESTED.is_set():
+            return None
+        response = SESSION.get(url, headers=headers)
         handle_rate_limit(response)
 
-        if response.status_code == 200:
+        if response.status_code == 304 and cached:
+            return cached["details"]
+        elif response.status_code == 200:
             data = response.json()
-            return {
+            details = {
                 "login": data["login"],
                 "id": data["id"],
                 "created_at": data["created_at"],
                 "avatar_url": data["avatar_url"],
                 "bio": data.get("bio")
             }
+            etag = response.headers.get("ETag")
+            if etag:
+                ETAG_CACHE[login] = {"etag": etag, "details": details}
+            return details
         elif response.status_code == 403:
-            print(f"[⚠️] 403 Forbidden - quota ou token ? Pause 60s...")
-            time.sleep(60)
+            log.warning("[⚠️] 403 Forbidden - quota ou token ? Pause 60s...")
+            STOP_REQUESTED.wait(60)
         elif response.status_code == 429:
-            print(f"[⚠️] 429 Too Many Requests - temporisation progressive...")
-            time.sleep(10)
+            log.warning("[⚠️] 429 Too Many Requests pour utilisateur %s (tentatives épuisées)", login)
         elif 500 <= response.status_code < 600:
-            print(f"[⚠️] Erreur serveur {response.status_code}, nouvelle tentative dans 5s...")
-            time.sleep(5)
+            log.warning("[⚠️] Erreur serveur %s pour utilisateur %s (tentatives épuisées)", response.status_code, login)
         else:
-            print(f"[⚠️] Erreur HTTP {response.status_code} pour utilisateur {login}")
+            log.warning("[⚠️] Erreur HTTP %s pour utilisateur %s", response.status_code, login)
     except Exception as e:
-        print(f"[❌] Exception lors de récupération de {login} : {e}")
+        log.error("[❌] Exception lors de récupération de %s : %s", login, e)
     return None
 
 # Point de départ pour la pagination (ID utilisateur)
 START_SINCE_ID = 30000000
 
+# === Cache disque des batches : data/batch_cache/<since_id>.json ===
+# Contient la réponse de pagination, les détails déjà récupérés pour ce batch et
+# la date de première récupération du batch (fetched_at), qui fixe sa validité.
+BATCH_CACHE_DIR = "data/batch_cache"
+BATCH_CACHE_TTL = 24 * 3600  # durée de validité en secondes
+
+def load_batch_cache(since_id):
+    """
+    Renvoie le batch en cache pour since_id
+    ({"batch": [...], "details": {login: {...}}, "fetched_at": <timestamp>}),
+    ou None si absent, illisible ou récupéré depuis plus de BATCH_CACHE_TTL.
+    """
+    path = os.path.join(BATCH_CACHE_DIR, f"{since_id}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if time.time() - cached.get("fetched_at", 0) >= BATCH_CACHE_TTL:
+        return None
+    return cached
+
+def save_batch_cache(since_id, batch, details_by_login, fetched_at):
+    """
+    Enregistre un batch et les détails de ses utilisateurs dans le cache disque.
+    fetched_at reste celui de la première récupération du batch : compléter les
+    détails ne prolonge pas la validité des données déjà en cache.
+    """
+    os.makedirs(BATCH_CACHE_DIR, exist_ok=True)
+    path = os.path.join(BATCH_CACHE_DIR, f"{since_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"batch": batch, "details": details_by_login, "fetched_at": fetched_at}, f, ensure_ascii=False)
+
+# Date limite de création (ISO 8601 : l'ordre lexicographique suit l'ordre chronologique)
+CUTOFF_ISO = "2015-01-01T00:00:00Z"
+
+def is_valid_user(details):
+    """
+    Filtre selon les critères demandés :
+    - created_at après 2015-01-01
+    - avatar_url non vide
+    - bio renseignée (pas None, pas vide)
+    """
+    if details["created_at"] < CUTOFF_ISO:
+        log.debug("[⏩] %s ignoré (créé le %.10s, avant 2015)", details["login"], details["created_at"])
+        return False
+
+    if not details["avatar_url"]:
+        log.debug("[⏩] %s ignoré (avatar_url vide)", details["login"])
+        return False
+
+    bio = details.get("bio")
+    if bio is None or bio.strip() == "":
+        log.debug("[⏩] %s ignoré (bio vide ou non renseignée)", details["login"])
+        return False
+
+    return True
+
 def extract_users(max_users):
     """
     Étape 4 & 5 : Pagination automatique et gestion des erreurs.
     - Récupère max_users utilisateurs en paginant via since=<id>.
     - Filtre utilisateurs créés après 2015, avec avatar_url non vide et bio renseignée.
+    - Les détails des utilisateurs d'un batch sont récupérés en parallèle, sans
+      dépasser le nombre encore nécessaire pour atteindre max_users.
+    - Les batches déjà traités depuis moins de 24h sont relus depuis data/batch_cache/.
     """
     users = []
+    seen_ids = set()  # ids déjà traités (évite doublons et requêtes inutiles)
     since_id = START_SINCE_ID
     no_new_user_count = 0  # compteur batches sans ajout utilisateur
+    executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    STOP_REQUESTED.clear()
+    ETAG_CACHE.clear()
+    ETAG_CACHE.update(load_etag_cache())
 
-    while len(users) < max_users:
-        print(f"[🔄] Requête utilisateurs depuis ID {since_id}...")
-        try:
-            # Récupération d'un batch d'utilisateurs (pagination)
-            response = requests.get(f"{USERS_ENDPOINT}?since={since_id}", headers=HEADERS)
-            handle_rate_limit(response)
+    try:
+        while len(users) < max_users:
+            try:
+                cached_batch = load_batch_cache(since_id)
+                if cached_batch:
+                    log.info("[📦] Utilisateurs depuis ID %s chargés depuis le cache.", since_id)
+                    batch = cached_batch["batch"]
+                    details_by_login = cached_batch["details"]
+                    fetched_at = cached_batch["fetched_at"]
+                else:
+                    log.info("[🔄] Requête utilisateurs depuis ID %s...", since_id)
+                    # Récupération d'un batch d'utilisateurs (pagination)
+                    RATE_LIMIT_OK.wait()
+                    response = SESSION.get(f"{USERS_ENDPOINT}?since={since_id}")
+                    handle_rate_limit(response)
 
-            if response.status_code != 200:
-                print(f"[⚠️] Erreur HTTP {response.status_code} sur la requête principale, pause 5s...")
-                time.sleep(5)
-                continue
+                    if response.status_code != 200:
+                        log.warning("[⚠️] Erreur HTTP %s sur la requête principale, pause 5s...", response.status_code)
+                        time.sleep(5)
+                        continue
 
-            batch = response.json()
-            if not batch:
-                print("[⚠️] Aucun utilisateur reçu, fin de pagination.")
-                break
+                    batch = response.json()
+                    details_by_login = {}
+                    fetched_at = time.time()
+                if not batch:
+                    log.warning("[⚠️] Aucun utilisateur reçu, fin de pagination.")
+                    break
 
-            new_users_in_batch = 0
+                new_users_in_batch = 0
+                fetched_any = False
 
-            for user in batch:
-                if len(users) >= max_users:
-                    break
+                # Ignorer les ids déjà vus, y compris les doublons au sein du même batch
+                new_in_batch = []
+                for user in batch:
+                    if user["id"] in seen_ids:
+                        continue
+                    seen_ids.add(user["id"])
+                    new_in_batch.append(user)
+                logins = [user["login"] for user in new_in_batch]
 
-                # Récupérer détails complets utilisateur
-                details = get_user_details(user["login"])
-                if not details:
-                    continue
-
-                # Filtrer selon les critères demandés :
-                # - created_at après 2015-01-01
-                # - avatar_url non vide
-                # - bio renseignée (pas None, pas vide)
-                cutoff_date = datetime(2015, 1, 1)
-                created_date = datetime.strptime(details["created_at"], "%Y-%m-%dT%H:%M:%SZ")
-                if created_date < cutoff_date:
-                    print(f"[⏩] {details['login']} ignoré (créé le {created_date.date()}, avant 2015)")
-                    continue
-
-                if not details["avatar_url"]:
-                    print(f"[⏩] {details['login']} ignoré (avatar_url vide)")
-                    continue
-
-                bio = details.get("bio")
-                if bio is None or bio.strip() == "":
-                    print(f"[⏩] {details['login']} ignoré (bio vide ou non renseignée)")
-                    continue
-
-                # Si passe tous les filtres, ajout à la liste
-                users.append(details)
-                new_users_in_batch += 1
-                print(f"[✔️] {details['login']} ajouté.")
-
-            if new_users_in_batch == 0:
-                no_new_user_count += 1
-                print(f"[⚠️] Aucun nouvel utilisateur ajouté dans ce batch ({no_new_user_count} fois de suite).")
-                if no_new_user_count >= 5:
-                    print("[⚠️] Arrêt : trop de batches sans ajout.")
-                    break
-            else:
-                no_new_user_count = 0
+                # Parcours du batch par tranches de la taille du nombre d'utilisateurs
+                # encore nécessaires : aucun détail n'est demandé au-delà de ce qu'une
+                # récupération séquentielle aurait demandé avant d'atteindre max_users
+                pos = 0
+                while pos < len(logins) and len(users) < max_users:
+                    chunk = logins[pos:pos + max_users - len(users)]
+                    pos += len(chunk)
 
-            # Préparer la prochaine pagination depuis le dernier ID de batch
-            since_id = batch[-1]["id"]
-            time.sleep(1)  # Petite pause pour ne pas spammer l'API
+                    # Récupérer détails complets des utilisateurs absents du cache
+                    # (en parallèle, ordre conservé)
+                    to_fetch = [login for login in chunk if login not in details_by_login]
+                    if to_fetch:
+                        fetched = executor.map(get_user_details, to_fetch)
+                        details_by_login.update((login, details) for login, details in zip(to_fetch, fetched) if details)
+                        fetched_any = True
 
-        except Exception as e:
-            print(f"[❌] Exception lors de la requête principale : {e}")
-            time.sleep(5)
+                    for login in chunk:
+                        details = details_by_login.get(login)
+                        if details and is_valid_user(details):
+                            # Si passe tous les filtres, ajout à la liste
+                            users.append(details)
+                            new_users_in_batch += 1
+                            log.info("[✔️] %s ajouté.", details["login"])
 
+                if fetched_any:
+                    save_batch_cache(since_id, batch, details_by_login, fetched_at)
+
+                if new_users_in_batch == 0:
+                    no_new_user_count += 1
+                    log.warning("[⚠️] Aucun nouvel utilisateur ajouté dans ce batch (%d fois de suite).", no_new_user_count)
+                    if no_new_user_count >= 5:
+                        log.warning("[⚠️] Arrêt : trop de batches sans ajout.")
+                        break
+                else:
+                    no_new_user_count = 0
+
+                # Préparer la prochaine pagination depuis le dernier ID de batch
+                since_id = batch[-1]["id"]
+                if not cached_batch or fetched_any:
+                    time.sleep(1)  # Petite pause pour ne pas spammer l'API
+
+            except Exception as e:
+                log.error("[❌] Exception lors de la requête principale : %s", e)
+                time.sleep(5)
+    finally:
+        # Réveille les threads en pause (quota, 403) et abandonne les requêtes en attente,
+        # pour qu'un Ctrl+C arrête l'extraction immédiatement
+        STOP_REQUESTED.set()
+        RATE_LIMIT_OK.set()
+        executor.shutdown(cancel_futures=True)
+        save_etag_cache()  # conserve les ETag récupérés même si l'extraction est interrompue
     return users
 
 # Fonction pour sauvegarder les utilisateurs extraits dans un fichier JSON
 def save_users_to_file(users, filename="data/users.json"):
     """
     Étape 6 : Enregistrer les données dans un JSON propre.
+    Écrit aussi un fichier de métadonnées indiquant que la liste est sans doublons.
     """
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(users, f, indent=2, ensure_ascii=False)
-    print(f"[💾] {len(users)} utilisateurs enregistrés dans {filename}")
+    with open(metadata_path(filename), "w", encoding="utf-8") as f:
+        json.dump({"deduplicated": True, "count": len(users)}, f)
+    log.info("[💾] %d utilisateurs enregistrés dans %s", len(users), filename)
 
 # Point d'entrée du script
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extraction utilisateurs GitHub")
     parser.add_argument("--max-users", type=int, default=60, help="Nombre maximum d'utilisateurs à récupérer")
+    parser.add_argument("--verbose", action="store_true", help="Affiche aussi les utilisateurs ignorés (niveau DEBUG)")
     args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="%(message)s")
 
-    print(f"[🚀] Début de l'extraction pour {args.max_users} utilisateurs...")
+    log.info("[🚀] Début de l'extraction pour %d utilisateurs...", args.max_users)
     users = extract_users(args.max_users)
     save_users_to_file(users)
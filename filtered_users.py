@@ -8,7 +8,7 @@ Script de filtrage et de nettoyage des utilisateurs extraits :
     - Bio non vide
     - Avatar non vide
     - Date de création après 2015-01-01
-- Sauvegarde le résultat dans data/filtered_users.json.
+- Sauvegarde le résultat dans data/filtered_users.json (JSON Lines : un utilisateur par ligne).
 
 Usage :
     python filtered_users.py
@@ -19,35 +19,56 @@ Prérequis :
 """
 
 import json
+import logging
 import os
-from datetime import datetime
+import orjson
 
-# Fonction pour charger les utilisateurs depuis un fichier JSON
-# Vérifie la présence des champs essentiels dans chaque utilisateur
+log = logging.getLogger(__name__)
+
+# Date limite de création (ISO 8601 : l'ordre lexicographique suit l'ordre chronologique)
+CUTOFF_ISO = "2015-01-01T00:00:00Z"
 
+# Fonction pour charger les utilisateurs depuis un fichier JSON
 def load_users(filepath):
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Fichier introuvable : {filepath}")
-    with open(filepath, "r", encoding="utf-8") as f:
-        users = json.load(f)
-    # Vérification simple structure : au moins un champ login et id
+    with open(filepath, "rb") as f:
+        return orjson.loads(f.read())
+
+# Chemin du fichier de métadonnées associé à un fichier d'utilisateurs
+# (écrit par extract_users.py, lu par is_deduplicated)
+def metadata_path(filename):
+    return os.path.splitext(filename)[0] + ".meta.json"
+
+# Indique si le fichier a été écrit sans doublons par extract_users.py
+# (métadonnées présentes et cohérentes avec le nombre d'utilisateurs chargés)
+def is_deduplicated(filepath, users):
+    meta_path = metadata_path(filepath)
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return meta.get("deduplicated") is True and meta.get("count") == len(users)
+
+# Fonction de nettoyage en une seule passe sur les utilisateurs :
+# vérification des champs, suppression des doublons (basé sur l'id) et filtrage.
+# Retourne la liste filtrée et le nombre de doublons supprimés.
+def clean_users(users, deduplicate=True):
+    seen = set()
+    filtered = []
+    duplicates = 0
     for u in users:
+        # Vérification simple structure : présence des champs essentiels
         if not all(k in u for k in ("login", "id", "created_at", "avatar_url", "bio")):
             raise ValueError("Format utilisateur incorrect, champs manquants")
-    return users
 
-# Fonction pour supprimer les doublons d'utilisateurs (basé sur l'id)
-def remove_duplicates(users):
-    unique = {}
-    for user in users:
-        unique[user["id"]] = user  # la clé unique est 'id', écrase doublons
-    return list(unique.values())
+        # Suppression des doublons : la clé unique est 'id', on garde la première occurrence
+        if deduplicate:
+            if u["id"] in seen:
+                duplicates += 1
+                continue
+            seen.add(u["id"])
 
-# Fonction pour filtrer les utilisateurs selon plusieurs critères
-def filter_users(users):
-    filtered = []
-    cutoff_date = datetime(2015, 1, 1)
-    for u in users:
         bio = u.get("bio")
         avatar = u.get("avatar_url")
         created_at_str = u.get("created_at")
@@ -59,13 +80,9 @@ def filter_users(users):
         if not avatar or avatar.strip() == "":
             continue
         # On ne garde que les utilisateurs créés après 2015-01-01
-        try:
-            created_at = datetime.strptime(created_at_str, "%Y-%m-%dT%H:%M:%SZ")
-        except Exception:
+        if not isinstance(created_at_str, str) or created_at_str < CUTOFF_ISO:
             continue
-        if created_at < cutoff_date:
-            continue
-        
+
         # Si tous les critères sont remplis, on ajoute l'utilisateur filtré
         filtered.append({
             "login": u["login"],
@@ -74,13 +91,15 @@ def filter_users(users):
             "avatar_url": u["avatar_url"],
             "bio": u["bio"]
         })
-    return filtered
+    return filtered, duplicates
 
-# Fonction pour sauvegarder les utilisateurs filtrés dans un fichier JSON
+# Fonction pour sauvegarder les utilisateurs filtrés au format JSON Lines
+# (un utilisateur par ligne : écriture rapide, lecture incrémentale possible)
 def save_filtered_users(users, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(users, f, indent=2, ensure_ascii=False)
+    with open(output_path, "wb") as f:
+        for u in users:
+            f.write(orjson.dumps(u, option=orjson.OPT_APPEND_NEWLINE))
 
 # Fonction principale du script
 def main():
@@ -90,26 +109,25 @@ def main():
     try:
         # Chargement des utilisateurs extraits
         users = load_users(input_path)
-        before_dedup = len(users)
-        # Suppression des doublons
-        users_no_dups = remove_duplicates(users)
-        after_dedup = len(users_no_dups)
-        # Application des filtres
-        filtered_users = filter_users(users_no_dups)
+        loaded = len(users)
+        # Vérification, suppression des doublons (inutile si extract_users.py l'a déjà fait)
+        # et application des filtres en une seule passe
+        filtered_users, duplicates = clean_users(users, deduplicate=not is_deduplicated(input_path, users))
         after_filter = len(filtered_users)
 
         # Sauvegarde du résultat
         save_filtered_users(filtered_users, output_path)
 
-        print(f"\n✅ Traitement terminé.")
-        print(f"👥 Utilisateurs chargés : {before_dedup}")
-        print(f"♻️  Doublons supprimés : {before_dedup - after_dedup}")
-        print(f"🔍 Utilisateurs filtrés : {after_filter}")
-        print(f"📁 Données sauvegardées dans : {output_path}\n")
+        log.info("\n✅ Traitement terminé.")
+        log.info("👥 Utilisateurs chargés : %d", loaded)
+        log.info("♻️  Doublons supprimés : %d", duplicates)
+        log.info("🔍 Utilisateurs filtrés : %d", after_filter)
+        log.info("📁 Données sauvegardées dans : %s\n", output_path)
 
     except Exception as e:
-        print(f"\n❌ Erreur lors du traitement : {e}\n")
+        log.error("\n❌ Erreur lors du traitement : %s\n", e)
 
 # Point d'entrée du script
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()